@@ -1,25 +1,48 @@
 from . import patch  # noqa  # isort: skip  # DO NOT REMOVE THIS LINE.
-from asyncio import new_event_loop
+from asyncio import AbstractEventLoopPolicy, gather, get_event_loop_policy, new_event_loop
 from itertools import count
+from operator import attrgetter
 from pathlib import Path
-from random import randint
-from typing import Any, Dict, List
+from random import choices, randint, sample
+from typing import Any, Dict, List, NamedTuple, Tuple
 
-import aiosqlite
-import asyncpg
-from asgi_lifespan import LifespanManager
-from cassandra.cluster import Cluster
 from fastapi import FastAPI
-from httpx import ASGITransport, AsyncClient
-from motor.motor_asyncio import AsyncIOMotorClient
 from pytest import FixtureRequest, Function, Parser, fixture
 from pytest_asyncio import fixture as async_fixture
 from typing_extensions import TypeAlias
 
 from .schemas import UserWithOrderOut
-from .utils import faker
+from .utils import create_client, faker, parse_obj_as
 
-RawData: TypeAlias = List[Dict[str, Any]]
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+class RawOrder(NamedTuple):
+    id: int
+    user_id: int
+    name: str
+
+
+class RawUser(NamedTuple):
+    id: int
+    name: str
+    orders: List[RawOrder]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "orders": [order._asdict() for order in self.orders],
+        }
+
+
+RawData: TypeAlias = List[RawUser]
+Rows: TypeAlias = List[Tuple[Any, ...]]
+
+_NAMES_POOL_SIZE = 256
 
 
 def pytest_addoption(parser: Parser):
@@ -62,32 +85,47 @@ def is_sql_tests_run(request):
 
 @fixture(scope="session")
 def raw_data() -> RawData:
+    users_count = 100
+
+    names = list({faker.name() for _ in range(_NAMES_POOL_SIZE)})
+    user_names = iter(sample(names, users_count))
+
     user_ids = count(1)
     order_ids = count(1)
 
-    def generate_one() -> Dict[str, Any]:
+    def generate_one() -> RawUser:
         """Generate a single user with unique user id"""
         id_ = next(user_ids)
 
-        return {
-            "id": id_,
-            "name": faker.name(),
-            "orders": [
-                {
-                    "id": next(order_ids),
-                    "user_id": id_,
-                    "name": faker.name(),
-                }
-                for _ in range(randint(1, 10))  # noqa: S311
+        return RawUser(
+            id=id_,
+            name=next(user_names),
+            orders=[
+                RawOrder(
+                    id=next(order_ids),
+                    user_id=id_,
+                    name=name,
+                )
+                for name in choices(names, k=randint(1, 10))  # noqa: S311
             ],
-        }
+        )
 
-    return [generate_one() for _ in range(100)]
+    return [generate_one() for _ in range(users_count)]
+
+
+@fixture(scope="session")
+def flat_users(raw_data: RawData) -> Rows:
+    return [(user.id, user.name) for user in raw_data]
+
+
+@fixture(scope="session")
+def flat_orders(raw_data: RawData) -> Rows:
+    return [order for user in raw_data for order in user.orders]
 
 
 @fixture(scope="session")
 def entities(raw_data: RawData) -> List[UserWithOrderOut]:
-    return [UserWithOrderOut(**data) for data in raw_data]
+    return parse_obj_as(List[UserWithOrderOut], raw_data)
 
 
 @fixture(scope="session")
@@ -95,40 +133,46 @@ def cassandra_session(cassandra_address: str, is_unit_tests_run: bool, is_sql_te
     if is_unit_tests_run or is_sql_tests_run:
         return
 
+    from cassandra.cluster import Cluster
+
     with Cluster(
         [
             cassandra_address,
         ],
     ).connect() as session:
-        ddl = "DROP KEYSPACE IF EXISTS  ks"
-        session.execute(ddl)
-
         ddl = (
             "CREATE KEYSPACE IF NOT EXISTS ks WITH replication = {'class': 'SimpleStrategy', 'replication_factor': '1'}"
         )
         session.execute(ddl)
 
+        # truncating existing tables is much cheaper than dropping and re-creating the whole keyspace
+        tables = session.execute("SELECT table_name FROM system_schema.tables WHERE keyspace_name = 'ks'")
+        futures = [session.execute_async(f"TRUNCATE ks.{table.table_name}") for table in tables]
+        for future in futures:
+            future.result()
+
         yield session
 
 
-@async_fixture(scope="session", autouse=True)
-async def _setup_postgres(postgres_url: str, raw_data: RawData, is_unit_tests_run: bool):
+async def _init_postgres(postgres_url: str, flat_users: Rows, flat_orders: Rows, is_unit_tests_run: bool) -> None:
     if is_unit_tests_run:
         return
 
-    async with asyncpg.create_pool(postgres_url) as pool:
-        await pool.fetch("DROP TABLE IF EXISTS users CASCADE;")
-        await pool.fetch("DROP TABLE IF EXISTS orders CASCADE;")
-        await pool.fetch(
+    import asyncpg
+
+    conn = await asyncpg.connect(postgres_url)
+
+    try:
+        await conn.execute(
             """
+        DROP TABLE IF EXISTS users CASCADE;
+        DROP TABLE IF EXISTS orders CASCADE;
+
         CREATE TABLE IF NOT EXISTS "users" (
             "id" SERIAL NOT NULL PRIMARY KEY,
             "name" TEXT NOT NULL
         );
-        """,
-        )
-        await pool.fetch(
-            """
+
         CREATE TABLE IF NOT EXISTS "orders" (
             "id" SERIAL NOT NULL PRIMARY KEY,
             "name" TEXT NOT NULL,
@@ -137,40 +181,41 @@ async def _setup_postgres(postgres_url: str, raw_data: RawData, is_unit_tests_ru
         """,
         )
 
-        await pool.executemany(
-            """
-            INSERT INTO "users" (id, name) VALUES ($1, $2)
-            """,
-            [(user["id"], user["name"]) for user in raw_data],
-        )
-        await pool.executemany(
-            """
-            INSERT INTO "orders" (id, user_id, name) VALUES ($1, $2, $3)
-            """,
-            [(order["id"], order["user_id"], order["name"]) for user in raw_data for order in user["orders"]],
-        )
-
-        await pool.fetch("COMMIT")
-
-
-@async_fixture(scope="session", autouse=True)
-async def _setup_sqlite(sqlite_file: str, raw_data: RawData, is_unit_tests_run: bool):
+        async with conn.transaction():
+            await conn.copy_records_to_table(
+                "users",
+                records=flat_users,
+                columns=("id", "name"),
+            )
+            await conn.copy_records_to_table(
+                "orders",
+                records=flat_orders,
+                columns=("id", "user_id", "name"),
+            )
+    finally:
+        await conn.close()
+
+
+async def _init_sqlite(sqlite_file: str, flat_users: Rows, flat_orders: Rows, is_unit_tests_run: bool) -> None:
     if is_unit_tests_run:
         return
 
+    import aiosqlite
+
     async with aiosqlite.connect(sqlite_file) as pool:
-        await pool.execute("DROP TABLE IF EXISTS orders;")
-        await pool.execute("DROP TABLE IF EXISTS users;")
-        await pool.execute(
+        await pool.execute("PRAGMA journal_mode=WAL;")
+        await pool.execute("PRAGMA synchronous=OFF;")
+
+        await pool.executescript(
             """
+        DROP TABLE IF EXISTS orders;
+        DROP TABLE IF EXISTS users;
+
         CREATE TABLE IF NOT EXISTS "users" (
             "id" INTEGER PRIMARY KEY NOT NULL,
             "name" TEXT NOT NULL
         );
-        """,
-        )
-        await pool.execute(
-            """
+
         CREATE TABLE IF NOT EXISTS "orders" (
             "id" INTEGER PRIMARY KEY NOT NULL,
             "name" TEXT NOT NULL,
@@ -179,35 +224,60 @@ async def _setup_sqlite(sqlite_file: str, raw_data: RawData, is_unit_tests_run:
         """,
         )
 
+        await pool.execute("BEGIN;")
         await pool.executemany(
             """
             INSERT INTO "users" (id, name) VALUES (?, ?)
             """,
-            [(user["id"], user["name"]) for user in raw_data],
+            flat_users,
         )
         await pool.executemany(
             """
             INSERT INTO "orders" (id, user_id, name) VALUES (?, ?, ?)
             """,
-            [(order["id"], order["user_id"], order["name"]) for user in raw_data for order in user["orders"]],
+            flat_orders,
         )
 
         await pool.commit()
 
 
-@async_fixture(scope="session", autouse=True)
-async def _setup_mongodb(mongodb_url: str, raw_data: RawData, is_unit_tests_run: bool, is_sql_tests_run: bool):
+async def _init_mongodb(
+    mongodb_url: str,
+    raw_data: RawData,
+    is_unit_tests_run: bool,
+    is_sql_tests_run: bool,
+) -> None:
     if is_unit_tests_run or is_sql_tests_run:
         return
 
+    from motor.motor_asyncio import AsyncIOMotorClient
+
     client = AsyncIOMotorClient(mongodb_url)
 
     await client.test.users.delete_many({})
-    await client.test.users.insert_many(raw_data)
+    await client.test.users.insert_many([user.to_dict() for user in raw_data])
 
     client.close()
 
 
+@async_fixture(scope="session", autouse=True)
+async def _setup_databases(
+    postgres_url: str,
+    sqlite_file: str,
+    mongodb_url: str,
+    raw_data: RawData,
+    flat_users: Rows,
+    flat_orders: Rows,
+    is_unit_tests_run: bool,
+    is_sql_tests_run: bool,
+):
+    await gather(
+        _init_postgres(postgres_url, flat_users, flat_orders, is_unit_tests_run),
+        _init_sqlite(sqlite_file, flat_users, flat_orders, is_unit_tests_run),
+        _init_mongodb(mongodb_url, raw_data, is_unit_tests_run, is_sql_tests_run),
+    )
+
+
 @fixture(scope="session")
 def mongodb_url(request: FixtureRequest) -> str:
     return request.config.getoption("--mongodb-dsn")
@@ -225,7 +295,7 @@ def cassandra_address(request: FixtureRequest) -> str:
 
 @fixture(scope="session")
 def sqlite_file() -> str:
-    return str(Path("./test_db.sqlite").resolve().absolute())
+    return str(Path("test_db.sqlite").resolve())
 
 
 @fixture(scope="session")
@@ -262,15 +332,19 @@ def event_loop():
     return new_event_loop()
 
 
+@fixture(scope="session")
+def event_loop_policy() -> AbstractEventLoopPolicy:
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+
+    return get_event_loop_policy()
+
+
 def pytest_collection_modifyitems(items: List[Function]):
-    items.sort(key=lambda it: (it.path, it.name))
+    items.sort(key=attrgetter("path", "name"))
 
 
 @async_fixture(scope="class")
 async def client(app: FastAPI):
-    async with LifespanManager(app), AsyncClient(
-        transport=ASGITransport(app),
-        base_url="http://testserver",
-        timeout=60,
-    ) as c:
+    async with create_client(app) as c:
         yield c
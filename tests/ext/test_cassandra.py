@@ -31,7 +31,7 @@ def app(cassandra_session, raw_data):
     connection.register_connection("cluster1", session=cassandra_session, default=True)
     management.sync_table(model=User, keyspaces=("ks",))
 
-    users = [User(group="GC", id=user.get("id"), name=user.get("name")) for user in raw_data]
+    users = [User(group="GC", id=user.id, name=user.name) for user in raw_data]
     for user in users:
         user.save()
 
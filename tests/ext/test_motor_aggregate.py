@@ -40,7 +40,7 @@ class TestMotorAggregate(BasePaginationTestCase):
     @async_fixture(scope="session")
     async def entities(self, db_client, raw_data):
         await db_client.test_agg.users.delete_many({})
-        await db_client.test_agg.users.insert_many(raw_data)
+        await db_client.test_agg.users.insert_many([user.to_dict() for user in raw_data])
 
         cursor = db_client.test_agg.users.aggregate(
             [
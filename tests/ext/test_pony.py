@@ -46,6 +46,14 @@ def pony_order(pony_db, pony_user):
     return Order
 
 
+@fixture(scope="session")
+def pony_mapping(pony_db, pony_user, pony_order):
+    with suppress(Exception):
+        pony_db.generate_mapping(create_tables=False)
+
+    return pony_db
+
+
 if IS_PYDANTIC_V2:
     from pydantic import field_validator
 
@@ -57,12 +65,9 @@ else:
 
 
 @fixture(scope="session")
-def app(pony_db, pony_user, pony_order, model_cls, model_with_rel_cls):
+def app(pony_mapping, pony_user, pony_order, model_cls, model_with_rel_cls):
     app = FastAPI()
 
-    with suppress(Exception):
-        pony_db.generate_mapping(create_tables=False)
-
     class model_pony_with_rel_cls(model_with_rel_cls):
         @_field_validator
         def pony_set_to_list(cls, values):
@@ -77,7 +82,7 @@ def app(pony_db, pony_user, pony_order, model_cls, model_with_rel_cls):
     @app.get("/relationship/limit-offset", response_model=LimitOffsetPage[model_pony_with_rel_cls])
     def route():
         with db_session:
-            return paginate(select(p for p in pony_user))
+            return paginate(select(p for p in pony_user).order_by(pony_user.id))
 
     return add_pagination(app)
 
@@ -3,6 +3,7 @@ from typing import Iterator, List
 from _pytest.python_api import raises
 from fastapi import Depends, FastAPI, status
 from pytest import fixture, mark
+from pytest_asyncio import fixture as async_fixture
 from sqlalchemy import select
 from sqlalchemy.orm.session import Session
 
@@ -11,7 +12,7 @@ from fastapi_pagination.cursor import CursorPage
 from fastapi_pagination.ext.sqlalchemy_future import paginate
 
 from ..schemas import UserOut
-from ..utils import parse_obj_as
+from ..utils import create_client, parse_obj_as
 from .utils import sqlalchemy20
 
 
@@ -42,6 +43,13 @@ def app(sa_user, sa_order, sa_session):
     return add_pagination(app)
 
 
+# tests below are module-level functions, so class-scoped client would be recreated for each of them
+@async_fixture(scope="session")
+async def client(app):
+    async with create_client(app) as c:
+        yield c
+
+
 @sqlalchemy20
 @mark.asyncio(loop_scope="session")
 async def test_cursor(app, client, entities):
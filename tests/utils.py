@@ -1,6 +1,10 @@
-from typing import Any, List, Type, TypeVar
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Type, TypeVar
 
+from asgi_lifespan import LifespanManager
 from faker import Faker
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
 from pydantic import BaseModel
 
 from fastapi_pagination import LimitOffsetPage, Page
@@ -35,6 +39,16 @@ else:
         return model.dump(obj, by_alias=True)
 
 
+@asynccontextmanager
+async def create_client(app: FastAPI) -> AsyncIterator[AsyncClient]:
+    async with LifespanManager(app), AsyncClient(
+        transport=ASGITransport(app),
+        base_url="http://testserver",
+        timeout=60,
+    ) as c:
+        yield c
+
+
 def normalize(model: Type[T], *models: Any) -> List[T]:
     return [parse_obj(model, m) for m in models]
 
@@ -46,6 +60,7 @@ OptionalLimitOffsetPage = CustomizedPage[LimitOffsetPage, UseOptionalParams()]
 __all__ = [
     "OptionalLimitOffsetPage",
     "OptionalPage",
+    "create_client",
     "dump_obj",
     "faker",
     "normalize",